@@ -1,7 +1,16 @@
 import streamlit as st
 import numpy as np
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image, ImageFilter, ImageStat
 import io
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import cv2
+except ImportError:  # optional: PIL's resize and blur are used instead
+    cv2 = None
 
 # Set page config
 st.set_page_config(
@@ -44,6 +53,170 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ITU-R 601-2 luma weights, as used by PIL's convert('L')
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# PIL's 3x3 SMOOTH kernel, the blur ImageEnhance.Sharpness blends against
+SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+
+# Standard deviation of PIL's 5x5 SMOOTH_MORE kernel
+SMOOTH_MORE_SIGMA = 0.86
+
+# Longest side of the interactive preview render; downloads use full resolution
+PREVIEW_MAX_SIZE = 1024
+
+# Settings read by the colour and upscaling stages; the rest only filter their output
+RESAMPLE_SETTINGS = ('scale_factor', 'interpolation', 'brightness', 'contrast', 'saturation')
+
+# Slider values at which every stage is a no-op
+IDENTITY_SETTINGS = {
+    'scale_factor': 1.0,
+    'brightness': 1.0,
+    'contrast': 1.0,
+    'saturation': 1.0,
+    'sharpness': 1.0,
+    'noise_reduction': 0.0
+}
+
+# Download encoders: Pillow format, save options, file extension and MIME type
+DOWNLOAD_FORMATS = {
+    'PNG': ('PNG', {'compress_level': 1}, 'png', 'image/png'),
+    'JPEG': ('JPEG', {'quality': 92}, 'jpg', 'image/jpeg'),
+    'WebP': ('WEBP', {'quality': 90, 'method': 4}, 'webp', 'image/webp')
+}
+
+# Threads for filtering tiles concurrently on the PIL fallback path (OpenCV threads internally)
+FILTER_THREADS = os.cpu_count() or 1
+
+# Fewest rows in a filter tile, so halo rows and task overhead stay small
+TILE_MIN_ROWS = 128
+
+# Pixels per strip processed by the fused kernels; keeps float32 temporaries in cache
+STRIP_PIXELS = 1 << 15
+
+def _bc_lut(brightness, contrast, pivot):
+    """256-entry lookup table applying brightness then contrast to one band"""
+    lut = np.arange(256, dtype=np.float32) * np.float32(brightness * contrast)
+    lut += np.float32((1.0 - contrast) * pivot)
+    return np.clip(lut, 0, 255).astype(np.uint8)
+
+@st.cache_resource(show_spinner=False)
+def _filter_pool():
+    """Thread pool for filtering tiles, created once per process and shared by all sessions"""
+    return ThreadPoolExecutor(max_workers=FILTER_THREADS)
+
+@st.cache_resource(show_spinner=False)
+def _numba_bcs_kernel():
+    """Compile the parallel fused color kernel once per process, or None without numba
+
+    Every session runs the kernel from its own script thread, so calls are
+    serialized behind a lock shared with the kernel.
+    """
+    # Imported here so the app only pays for numba when the kernel is needed
+    try:
+        import numba
+    except ImportError:  # optional: the NumPy kernels are used instead
+        return None
+    
+    # TBB hangs the interpreter at exit once driven from non-main threads
+    numba.config.THREADING_LAYER_PRIORITY = ['omp', 'workqueue', 'tbb']
+    lock = threading.Lock()
+    
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def kernel(arr, out, pixel_gain, luma_gain, offset):
+        # Same float32 maths as the NumPy path, parallel over rows
+        height, width, channels = arr.shape
+        for y in numba.prange(height):
+            for x in range(width):
+                luma = (np.float32(arr[y, x, 0]) * np.float32(0.299)
+                        + np.float32(arr[y, x, 1]) * np.float32(0.587)
+                        + np.float32(arr[y, x, 2]) * np.float32(0.114)) * luma_gain + offset
+                for c in range(channels):
+                    value = np.float32(arr[y, x, c]) * pixel_gain + luma
+                    out[y, x, c] = np.uint8(min(max(value, np.float32(0.0)), np.float32(255.0)))
+    
+    def run(arr, out, pixel_gain, luma_gain, offset):
+        with lock:
+            kernel(arr, out, pixel_gain, luma_gain, offset)
+    
+    return run
+
+def _fused_bcs(arr, brightness, contrast, saturation, pivot, out=None):
+    """Apply brightness, contrast and saturation to a uint8 RGB array in one pass
+
+    Folds the three ImageEnhance blends into a single affine map per pixel:
+    contrast pivots on ``pivot`` (the mean luminance) and saturation blends
+    against the luminance, as Brightness -> Contrast -> Color do in PIL.
+    ``out`` may be ``arr`` itself to update the pixels in place.
+    """
+    gain = brightness * contrast
+    offset = np.float32((1.0 - contrast) * pivot)
+    pixel_gain = np.float32(gain * saturation)
+    luma_gain = np.float32(gain * (1.0 - saturation))
+    
+    result = np.empty_like(arr) if out is None else out
+    if cv2 is not None:
+        # The same map as a 3x4 colour matrix, applied in one vectorized pass;
+        # cv2 rounds to nearest, so shift by half a level to truncate like the kernels below
+        matrix = np.empty((3, 4), dtype=np.float32)
+        matrix[:, :3] = luma_gain * LUMA_WEIGHTS
+        matrix[:, :3] += pixel_gain * np.eye(3, dtype=np.float32)
+        matrix[:, 3] = offset - np.float32(0.5)
+        return cv2.transform(arr, matrix, dst=result)
+    
+    kernel = _numba_bcs_kernel()
+    if kernel is not None:
+        kernel(arr, result, pixel_gain, luma_gain, offset)
+        return result
+    
+    rows = max(1, STRIP_PIXELS // arr.shape[1])
+    for y in range(0, arr.shape[0], rows):
+        strip = arr[y:y + rows]
+        # gain * (Y + saturation * (rgb - Y)) + offset
+        luma = strip @ LUMA_WEIGHTS
+        luma *= luma_gain
+        luma += offset
+        values = np.multiply(strip, pixel_gain, dtype=np.float32)
+        values += luma[..., None]
+        np.clip(values, 0, 255, out=values)
+        result[y:y + rows] = values
+    return result
+
+def _filter_tiles(arr, image_filter, halo):
+    """Apply a PIL filter to a uint8 array in row strips per band on the shared filter pool
+
+    Pillow releases the GIL while filtering, so the tiles run in parallel. Each
+    strip is filtered with halo extra rows on both sides, at least the filter's
+    vertical reach, and cropped back so the seams match a whole-image pass.
+    """
+    image = Image.fromarray(arr)
+    channels = 1 if arr.ndim == 2 else arr.shape[2]
+    height = arr.shape[0]
+    strips = min(-(-FILTER_THREADS // channels), max(1, height // TILE_MIN_ROWS))
+    if FILTER_THREADS == 1 or (strips == 1 and channels == 1):
+        return np.array(image.filter(image_filter))
+    
+    bands = image.split()
+    width = arr.shape[1]
+    rows = -(-height // strips)
+    
+    def filter_tile(tile):
+        band, top = tile
+        bottom = min(top + rows, height)
+        padded_top = max(top - halo, 0)
+        strip = bands[band].crop((0, padded_top, width, min(bottom + halo, height)))
+        filtered = np.asarray(strip.filter(image_filter))
+        return filtered[top - padded_top:bottom - padded_top]
+    
+    tiles = [(band, top) for band in range(len(bands)) for top in range(0, height, rows)]
+    out = np.empty_like(arr)
+    for (band, top), filtered in zip(tiles, _filter_pool().map(filter_tile, tiles)):
+        if arr.ndim == 2:
+            out[top:top + rows] = filtered
+        else:
+            out[top:top + rows, :, band] = filtered
+    return out
+
 class ImageEnhancer:
     def __init__(self):
         self.supported_formats = ['PNG', 'JPEG', 'JPG', 'TIFF', 'TIF']
@@ -60,41 +233,108 @@ class ImageEnhancer:
         return True, "Valid image file"
     
     def enhance_image(self, image, settings):
-        """Apply various enhancement techniques using only PIL"""
-        enhanced_image = image.copy()
+        """Apply various enhancement techniques using PIL and NumPy
         
-        # 1. Upscaling using PIL
-        if settings['scale_factor'] != 1.0:
-            enhanced_image = self.upscale_image(enhanced_image, settings['scale_factor'], settings['interpolation'])
+        The stages share one uint8 array, updated in place where possible,
+        and the result is wrapped in a PIL image once at the end.
+        """
+        if self.is_identity(settings):
+            return image
+        
+        return self.apply_filters(self.prepare_base(image, settings), settings)
+    
+    def is_identity(self, settings):
+        """True when the settings leave the image unchanged"""
+        return all(settings[key] == value for key, value in IDENTITY_SETTINGS.items())
+    
+    def prepare_base(self, image, settings):
+        """Run the colour and upscaling stages, returning a uint8 array
         
-        # 2. Apply brightness
-        if settings['brightness'] != 1.0:
-            enhancer = ImageEnhance.Brightness(enhanced_image)
-            enhanced_image = enhancer.enhance(settings['brightness'])
+        Only the RESAMPLE_SETTINGS keys are read, so the result can be reused
+        while sharpness and noise reduction change.
+        """
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        arr = np.array(image)
         
-        # 3. Apply contrast
-        if settings['contrast'] != 1.0:
-            enhancer = ImageEnhance.Contrast(enhanced_image)
-            enhanced_image = enhancer.enhance(settings['contrast'])
+        # 1. Apply brightness, contrast and saturation in one pass. These are
+        # per-pixel maps that commute with resizing, so run them before the
+        # upscale on scale_factor² fewer pixels
+        if (settings['brightness'], settings['contrast'], settings['saturation']) != (1.0, 1.0, 1.0):
+            arr = self.adjust_colors(arr, settings['brightness'], settings['contrast'], settings['saturation'])
         
-        # 4. Apply saturation
-        if settings['saturation'] != 1.0:
-            enhancer = ImageEnhance.Color(enhanced_image)
-            enhanced_image = enhancer.enhance(settings['saturation'])
+        # 2. Upscaling
+        if settings['scale_factor'] != 1.0:
+            arr = self.upscale_image(arr, settings['scale_factor'], settings['interpolation'])
         
-        # 5. Apply sharpening
+        return arr
+    
+    def apply_filters(self, arr, settings):
+        """Run the sharpening and noise-reduction stages on a uint8 array in place"""
+        # 3. Apply sharpening (kernel is pixel-relative, so at output resolution)
         if settings['sharpness'] != 1.0:
-            enhancer = ImageEnhance.Sharpness(enhanced_image)
-            enhanced_image = enhancer.enhance(settings['sharpness'])
+            arr = self.apply_sharpening(arr, settings['sharpness'])
         
-        # 6. Apply noise reduction (using PIL filters)
+        # 4. Apply noise reduction
         if settings['noise_reduction'] > 0:
-            enhanced_image = self.apply_noise_reduction(enhanced_image, settings['noise_reduction'])
+            arr = self.apply_noise_reduction(arr, settings['noise_reduction'])
+        
+        return Image.fromarray(arr)
+    
+    def preview_source(self, image, scale_factor, max_size=PREVIEW_MAX_SIZE):
+        """Reduced copy of the image whose upscaled output fits within max_size"""
+        bound = max(1, int(max_size / scale_factor))
+        if max(image.size) > bound:
+            image = image.copy()
+            image.thumbnail((bound, bound), Image.BILINEAR)
+        return image
+    
+    def adjust_colors(self, arr, brightness, contrast, saturation):
+        """Apply brightness, contrast and saturation to a uint8 RGB or L array in place"""
+        # Contrast pivots on the mean luminance of the brightened image, like ImageEnhance.Contrast
+        pivot = 0.0
+        if contrast != 1.0:
+            if cv2 is not None:
+                # Weight the per-channel means instead of building a grayscale copy
+                channel_means = cv2.mean(arr)
+                luma_mean = channel_means[0] if arr.ndim == 2 else float(np.dot(LUMA_WEIGHTS, channel_means[:3]))
+            else:
+                luma_mean = ImageStat.Stat(Image.fromarray(arr).convert('L')).mean[0]
+            pivot = int(brightness * luma_mean + 0.5)
+        
+        if saturation == 1.0 or arr.ndim == 2:
+            # Brightness and contrast alone are a per-band 1-D map: one table lookup
+            lut = _bc_lut(brightness, contrast, pivot)
+            if cv2 is not None:
+                # One vectorized lookup across all channels
+                return cv2.LUT(arr, lut, dst=arr)
+            return np.take(lut, arr, out=arr)
         
-        return enhanced_image
+        return _fused_bcs(arr, brightness, contrast, saturation, pivot, out=arr)
     
-    def upscale_image(self, image, scale_factor, interpolation_method):
-        """Upscale image using PIL only"""
+    def upscale_image(self, arr, scale_factor, interpolation_method):
+        """Upscale a uint8 array with OpenCV when installed, otherwise with PIL"""
+        if scale_factor == 1.0:
+            return arr
+        
+        size = self.output_size((arr.shape[1], arr.shape[0]), scale_factor)
+        
+        if cv2 is not None:
+            # Multi-threaded, SIMD-vectorized resize; NEAREST_EXACT samples like PIL
+            cv2_interpolation_map = {
+                'Bicubic': cv2.INTER_CUBIC,
+                'Bilinear': cv2.INTER_LINEAR,
+                'Lanczos': cv2.INTER_LANCZOS4,
+                'Nearest': cv2.INTER_NEAREST_EXACT
+            }
+            interpolation = cv2_interpolation_map.get(interpolation_method, cv2.INTER_CUBIC)
+            return cv2.resize(arr, size, interpolation=interpolation)
+        
+        if interpolation_method == 'Nearest' and float(scale_factor).is_integer():
+            # Whole-number nearest-neighbour upscaling just repeats each pixel
+            factor = int(scale_factor)
+            return np.repeat(np.repeat(arr, factor, axis=0), factor, axis=1)
+        
         # Map interpolation methods to PIL constants
         interpolation_map = {
             'Bicubic': Image.BICUBIC,
@@ -105,102 +345,191 @@ class ImageEnhancer:
         
         interpolation = interpolation_map.get(interpolation_method, Image.BICUBIC)
         
-        # Calculate new size
-        new_width = int(image.width * scale_factor)
-        new_height = int(image.height * scale_factor)
+        return np.array(Image.fromarray(arr).resize(size, interpolation))
+    
+    def apply_sharpening(self, arr, sharpness):
+        """Sharpen a uint8 array like ImageEnhance.Sharpness, as a single 3x3 convolution"""
+        # sharpness * image + (1 - sharpness) * SMOOTH(image), folded into one kernel
+        kernel = (1.0 - sharpness) * SMOOTH_KERNEL
+        kernel[1, 1] += sharpness
+        
+        if cv2 is not None:
+            out = cv2.filter2D(arr, -1, kernel, borderType=cv2.BORDER_REPLICATE)
+            # PIL leaves the outermost pixels unfiltered
+            out[[0, -1]] = arr[[0, -1]]
+            out[:, [0, -1]] = arr[:, [0, -1]]
+            return out
         
-        return image.resize((new_width, new_height), interpolation)
+        return _filter_tiles(arr, ImageFilter.Kernel((3, 3), kernel.ravel().tolist(), scale=1), halo=1)
     
-    def apply_noise_reduction(self, image, noise_reduction_factor):
-        """Apply noise reduction using PIL filters only"""
+    def output_size(self, size, scale_factor):
+        """Size of an image of the given (width, height) after upscaling by scale_factor"""
+        return int(size[0] * scale_factor), int(size[1] * scale_factor)
+    
+    def apply_noise_reduction(self, arr, noise_reduction_factor):
+        """Apply noise reduction to a uint8 array as a single separable Gaussian blur"""
         if noise_reduction_factor <= 0.3:
             # Light smoothing
             radius = noise_reduction_factor * 2
-            return image.filter(ImageFilter.GaussianBlur(radius=radius))
         elif noise_reduction_factor <= 0.6:
-            # Medium smoothing
-            return image.filter(ImageFilter.SMOOTH_MORE)
+            # Medium smoothing, equivalent to SMOOTH_MORE
+            radius = SMOOTH_MORE_SIGMA
         else:
-            # Heavy smoothing
-            smoothed = image.filter(ImageFilter.SMOOTH_MORE)
-            radius = (noise_reduction_factor - 0.6) * 3
-            return smoothed.filter(ImageFilter.GaussianBlur(radius=radius))
+            # Heavy smoothing: SMOOTH_MORE followed by a Gaussian, folded into one
+            # blur (variances of stacked Gaussians add)
+            radius = math.hypot(SMOOTH_MORE_SIGMA, (noise_reduction_factor - 0.6) * 3)
+        
+        if cv2 is not None:
+            # PIL's radius is the standard deviation; replicate edges as PIL does
+            return cv2.GaussianBlur(arr, (0, 0), sigmaX=radius, dst=arr,
+                                    borderType=cv2.BORDER_REPLICATE)
+        
+        # Pillow approximates the Gaussian with three box blurs of radius under radius + 1
+        return _filter_tiles(arr, ImageFilter.GaussianBlur(radius=radius), halo=3 * (int(radius) + 2))
     
     def get_image_stats(self, image):
-        """Get image statistics"""
-        img_array = np.array(image)
+        """Get image statistics in one histogram pass, without copying the pixels"""
+        stat = ImageStat.Stat(image)
+        bands = len(image.getbands())
+        # Pool the per-band sums so mean/std cover all samples, as np.mean/np.std would
+        count = sum(stat.count)
+        mean = sum(stat.sum) / count
+        variance = max(sum(stat.sum2) / count - mean * mean, 0.0)
         return {
             'width': image.width,
             'height': image.height,
-            'channels': len(img_array.shape) if len(img_array.shape) > 2 else 1,
-            'mean_brightness': np.mean(img_array),
-            'std_brightness': np.std(img_array),
-            'file_size_mb': len(image.tobytes()) / (1024 * 1024)
+            'channels': bands,
+            'mean_brightness': mean,
+            'std_brightness': math.sqrt(variance),
+            'file_size_mb': image.width * image.height * bands / (1024 * 1024)
         }
 
-def main():
-    # Header
-    st.markdown("""
-    <div class="main-header">
-        <h1>🎨 Image Quality Enhancer</h1>
-        <p style="text-align: center; color: white; margin: 0;">
-            Minimal Dependencies Version - Works on All Platforms!
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Success message
-    st.success("✅ **Minimal Version Loaded Successfully!** - Only using PIL + NumPy")
+def _flatten_alpha(image, background='white'):
+    """Composite a transparent image onto a solid background in one C pass"""
+    if image.mode not in ('RGBA', 'LA'):
+        image = image.convert('LA' if image.mode == 'L' else 'RGBA')
+    flat = Image.new(image.mode[:-1], image.size, background)
+    # An image with an alpha band can serve as its own paste mask
+    flat.paste(image, mask=image)
+    return flat
+
+def load_image(image_bytes, max_size=None):
+    """Decode uploaded image bytes into an RGB or L PIL image
+
+    With max_size the image is shrunk to fit within max_size; JPEGs are then
+    decoded directly at a reduced scale instead of at full resolution.
+    Transparent images are flattened onto white.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    target = None
+    if max_size is not None and max(image.size) > max_size:
+        ratio = max_size / max(image.size)
+        target = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+        if image.format == 'JPEG':
+            # Let libjpeg downsample by 1/2, 1/4 or 1/8 during decode
+            image.draft('RGB', target)
     
-    # Initialize enhancer
-    if 'enhancer' not in st.session_state:
-        st.session_state.enhancer = ImageEnhancer()
+    # Normalise the mode before shrinking: thumbnail() rejects 16-bit modes
+    # and resamples palette images with NEAREST
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        image = _flatten_alpha(image)
+    elif image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
     
-    # File upload
-    st.subheader("📁 Upload Your Image")
-    uploaded_file = st.file_uploader(
-        "Choose an image file",
-        type=['png', 'jpg', 'jpeg', 'tiff', 'tif'],
-        help="Upload JPEG, PNG, or TIFF images"
-    )
+    if target is not None:
+        image.thumbnail(target, Image.BILINEAR)
+    return image
+
+@st.cache_resource(show_spinner=False)
+def _get_enhancer():
+    """The ImageEnhancer shared by every session and cached helper; it holds no per-image state"""
+    return ImageEnhancer()
+
+# The cached functions below take the upload as (image_key, _image_bytes): the
+# leading underscore keeps Streamlit from rehashing the whole file on every call,
+# and the short per-upload image_key identifies it in the cache instead.
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _load_preview_cached(image_key, _image_bytes):
+    """Decode the upload once at preview resolution"""
+    return load_image(_image_bytes, max_size=PREVIEW_MAX_SIZE)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _preview_base_cached(image_key, _image_bytes, resample_key):
+    """Colour-adjusted, upscaled preview array, shared by every sharpness/noise setting"""
+    settings = dict(resample_key)
+    enhancer = _get_enhancer()
+    image = enhancer.preview_source(_load_preview_cached(image_key, _image_bytes), settings['scale_factor'])
+    return enhancer.prepare_base(image, settings)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _preview_sharpened_cached(image_key, _image_bytes, resample_key, sharpness):
+    """Sharpened preview array, shared by every noise-reduction setting"""
+    base = _preview_base_cached(image_key, _image_bytes, resample_key)
+    if sharpness != 1.0:
+        base = _get_enhancer().apply_sharpening(base, sharpness)
+    return base
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _enhance_preview_cached(image_key, _image_bytes, settings):
+    """Render the interactive preview, memoized on the upload key and settings tuple
     
-    if uploaded_file is None:
-        st.info("👆 Please upload an image file to get started!")
-        st.markdown("""
-        ### 📋 Features (Minimal Version):
-        - **Real-time preview**: See changes instantly
-        - **Image upscaling**: 1x to 4x resolution increase
-        - **Basic enhancements**: Brightness, contrast, saturation, sharpness
-        - **Noise reduction**: Gaussian blur and smoothing filters
-        - **Download results**: Save your enhanced images
-        - **Zero dependency issues**: Uses only PIL and NumPy
-        """)
-        return
+    Each stage is cached on the settings it reads, so moving a slider only
+    reruns its own stage and the ones after it.
+    """
+    settings = dict(settings)
+    enhancer = _get_enhancer()
+    if enhancer.is_identity(settings):
+        return _load_preview_cached(image_key, _image_bytes)
     
-    # Validate file
-    is_valid, message = st.session_state.enhancer.validate_image(uploaded_file)
-    if not is_valid:
-        st.error(f"❌ {message}")
-        return
+    resample_key = tuple((key, settings[key]) for key in RESAMPLE_SETTINGS)
+    # cache_data hands back a copy, so noise reduction can work on it in place
+    arr = _preview_sharpened_cached(image_key, _image_bytes, resample_key, settings['sharpness'])
+    if settings['noise_reduction'] > 0:
+        arr = enhancer.apply_noise_reduction(arr, settings['noise_reduction'])
+    return Image.fromarray(arr)
+
+def _encode_download(image_bytes, settings, download_format='PNG'):
+    """Enhance at full resolution and encode the result in one of DOWNLOAD_FORMATS
     
-    # Load image
-    try:
-        original_image = Image.open(uploaded_file)
-        if original_image.mode == 'RGBA':
-            original_image = original_image.convert('RGB')
-        
-        st.session_state.original_image = original_image
-        st.success(f"✅ Image loaded: {original_image.width}×{original_image.height} pixels")
-    except Exception as e:
-        st.error(f"❌ Error loading image: {str(e)}")
-        return
+    Not cached: the download button only calls this on click, and a full-size
+    result can run to hundreds of megabytes per entry.
+    """
+    enhanced_image = _get_enhancer().enhance_image(load_image(image_bytes), dict(settings))
+    pil_format, save_options, _, _ = DOWNLOAD_FORMATS[download_format]
+    img_buffer = io.BytesIO()
+    # PNG uses zlib level 1: about 4x faster than the default 6 for a ~30% larger file
+    enhanced_image.save(img_buffer, format=pil_format, **save_options)
+    return img_buffer.getvalue()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _image_stats_cached(image_key, _image_bytes, settings=None):
+    """Statistics of the original image, or of the enhanced output when settings are given
+
+    Both are measured on the preview-sized image and reported at the full
+    resolution, so the original never has to be decoded at full size.
+    """
+    enhancer = _get_enhancer()
+    width, height = Image.open(io.BytesIO(_image_bytes)).size
+    if settings is None:
+        stats = enhancer.get_image_stats(_load_preview_cached(image_key, _image_bytes))
+    else:
+        stats = enhancer.get_image_stats(_enhance_preview_cached(image_key, _image_bytes, settings))
+        width, height = enhancer.output_size((width, height), dict(settings)['scale_factor'])
     
-    # Real-time enhancement indicator
-    st.markdown("""
-    <div class="real-time-indicator">
-        🔄 <strong>Real-time Enhancement Active</strong> - Adjust sliders to see instant changes!
-    </div>
-    """, unsafe_allow_html=True)
+    stats['file_size_mb'] *= (width * height) / (stats['width'] * stats['height'])
+    stats['width'], stats['height'] = width, height
+    return stats
+
+def _reset_settings():
+    """Return the sliders to their no-op values; runs as a callback, before the widgets are created"""
+    for key, value in IDENTITY_SETTINGS.items():
+        st.session_state[key] = value
+
+@st.fragment
+def render_editor(original_image, original_size, file_name):
+    """Settings sliders and preview, rerun without the header, upload and decode steps"""
+    original_width, original_height = original_size
     
     # Create two columns for controls and preview
     control_col, preview_col = st.columns([1, 2])
@@ -208,89 +537,95 @@ def main():
     with control_col:
         st.header("🛠️ Enhancement Settings")
         
-        # Scaling Options
-        st.subheader("🔍 Scaling Options")
-        scale_factor = st.slider(
-            "Scale Factor",
-            min_value=1.0,
-            max_value=4.0,
-            value=2.0,
-            step=0.1,
-            help="Increase image resolution",
-            key="scale_factor"
-        )
-        
-        interpolation_method = st.selectbox(
-            "Interpolation Method",
-            ['Bicubic', 'Bilinear', 'Lanczos', 'Nearest'],
-            index=0,
-            help="Algorithm used for upscaling",
-            key="interpolation"
-        )
-        
-        # Enhancement Controls
-        st.subheader("✨ Enhancement Controls")
-        brightness = st.slider(
-            "Brightness",
-            min_value=0.5,
-            max_value=2.0,
-            value=1.0,
-            step=0.1,
-            help="Adjust image brightness",
-            key="brightness"
-        )
-        
-        contrast = st.slider(
-            "Contrast",
-            min_value=0.5,
-            max_value=2.0,
-            value=1.0,
-            step=0.1,
-            help="Adjust image contrast",
-            key="contrast"
+        live_preview = st.toggle(
+            "⚡ Live Preview",
+            value=True,
+            help="Update the preview on every slider change; turn off to adjust several settings and apply them together",
+            key="live_preview"
         )
         
-        saturation = st.slider(
-            "Saturation",
-            min_value=0.0,
-            max_value=2.0,
-            value=1.0,
-            step=0.1,
-            help="Adjust color saturation",
-            key="saturation"
-        )
-        
-        sharpness = st.slider(
-            "Sharpness",
-            min_value=0.5,
-            max_value=3.0,
-            value=1.0,
-            step=0.1,
-            help="Enhance image sharpness",
-            key="sharpness"
-        )
-        
-        # Noise Reduction
-        st.subheader("🎛️ Noise Reduction")
-        noise_reduction = st.slider(
-            "Noise Reduction",
-            min_value=0.0,
-            max_value=1.0,
-            value=0.0,
-            step=0.1,
-            help="Reduce image noise (using Gaussian blur)",
-            key="noise_reduction"
-        )
+        # Without live preview the sliders sit in a form, so the editor only reruns on Apply
+        controls = st.container() if live_preview else st.form("controls", border=False)
+        with controls:
+            # Scaling Options
+            st.subheader("🔍 Scaling Options")
+            scale_factor = st.slider(
+                "Scale Factor",
+                min_value=1.0,
+                max_value=4.0,
+                value=1.0,
+                step=0.1,
+                help="Increase image resolution",
+                key="scale_factor"
+            )
+            
+            interpolation_method = st.selectbox(
+                "Interpolation Method",
+                ['Bicubic', 'Bilinear', 'Lanczos', 'Nearest'],
+                index=0,
+                help="Algorithm used for upscaling",
+                key="interpolation"
+            )
+            
+            # Enhancement Controls
+            st.subheader("✨ Enhancement Controls")
+            brightness = st.slider(
+                "Brightness",
+                min_value=0.5,
+                max_value=2.0,
+                value=1.0,
+                step=0.1,
+                help="Adjust image brightness",
+                key="brightness"
+            )
+            
+            contrast = st.slider(
+                "Contrast",
+                min_value=0.5,
+                max_value=2.0,
+                value=1.0,
+                step=0.1,
+                help="Adjust image contrast",
+                key="contrast"
+            )
+            
+            saturation = st.slider(
+                "Saturation",
+                min_value=0.0,
+                max_value=2.0,
+                value=1.0,
+                step=0.1,
+                help="Adjust color saturation",
+                key="saturation"
+            )
+            
+            sharpness = st.slider(
+                "Sharpness",
+                min_value=0.5,
+                max_value=3.0,
+                value=1.0,
+                step=0.1,
+                help="Enhance image sharpness",
+                key="sharpness"
+            )
+            
+            # Noise Reduction
+            st.subheader("🎛️ Noise Reduction")
+            noise_reduction = st.slider(
+                "Noise Reduction",
+                min_value=0.0,
+                max_value=1.0,
+                value=0.0,
+                step=0.1,
+                help="Reduce image noise (using Gaussian blur)",
+                key="noise_reduction"
+            )
+            
+            if not live_preview:
+                st.form_submit_button("✨ Apply", type="primary", width="stretch")
         
         # Reset button
-        if st.button("🔄 Reset All Settings", type="secondary"):
-            st.session_state.scale_factor = 2.0
-            st.session_state.brightness = 1.0
-            st.session_state.contrast = 1.0
-            st.session_state.saturation = 1.0
-            st.session_state.sharpness = 1.0
-            st.session_state.noise_reduction = 0.0
-            st.rerun()
+        st.button("🔄 Reset All Settings", type="secondary", on_click=_reset_settings)
     
     with preview_col:
         # Enhancement settings dictionary
@@ -303,11 +638,18 @@ def main():
             'sharpness': sharpness,
             'noise_reduction': noise_reduction
         }
+        # Hashable form of the settings, used as the cache key
+        settings_key = tuple(sorted(settings.items()))
+        image_key = st.session_state.image_key
+        image_bytes = st.session_state.image_bytes
         
-        # Real-time enhancement
+        # Real-time enhancement on a display-sized preview (cached: unchanged settings skip the pipeline)
         try:
             with st.spinner("🔄 Applying enhancements..."):
-                enhanced_image = st.session_state.enhancer.enhance_image(original_image, settings)
+                enhanced_image = _enhance_preview_cached(image_key, image_bytes, settings_key)
+            output_width, output_height = _get_enhancer().output_size(
+                (original_width, original_height), scale_factor
+            )
             
             # Display images in tabs
             tab1, tab2 = st.tabs(["🔍 Comparison View", "📊 Statistics"])
@@ -318,32 +660,43 @@ def main():
                 
                 with img_col1:
                     st.subheader("📷 Original")
-                    st.image(original_image, use_container_width=True)
-                    st.caption(f"Size: {original_image.width}×{original_image.height}")
+                    st.image(original_image, width="stretch")
+                    st.caption(f"Size: {original_width}×{original_height}")
                 
                 with img_col2:
                     st.subheader("✨ Enhanced")
-                    st.image(enhanced_image, use_container_width=True)
-                    st.caption(f"Size: {enhanced_image.width}×{enhanced_image.height}")
-                
-                # Download button
-                img_buffer = io.BytesIO()
-                enhanced_image.save(img_buffer, format='PNG', quality=95)
-                img_buffer.seek(0)
+                    st.image(enhanced_image, width="stretch")
+                    if enhanced_image.size == (output_width, output_height):
+                        st.caption(f"Size: {output_width}×{output_height}")
+                    else:
+                        st.caption(
+                            f"Size: {output_width}×{output_height} "
+                            f"(previewed at {enhanced_image.width}×{enhanced_image.height}, downloaded at full size)"
+                        )
                 
+                # Download button (full resolution, rendered only when clicked)
+                download_format = st.radio(
+                    "Download Format",
+                    list(DOWNLOAD_FORMATS),
+                    horizontal=True,
+                    help="PNG is lossless; JPEG is the fastest to encode and WebP gives the smallest files",
+                    key="download_format"
+                )
+                _, _, extension, mime = DOWNLOAD_FORMATS[download_format]
                 st.download_button(
                     label="💾 Download Enhanced Image",
-                    data=img_buffer.getvalue(),
-                    file_name=f"enhanced_{uploaded_file.name.split('.')[0]}.png",
-                    mime="image/png",
+                    data=lambda: _encode_download(image_bytes, settings_key, download_format),
+                    file_name=f"enhanced_{file_name.split('.')[0]}.{extension}",
+                    mime=mime,
+                    on_click="ignore",
                     type="primary",
-                    use_container_width=True
+                    width="stretch"
                 )
             
             with tab2:
                 # Get statistics
-                original_stats = st.session_state.enhancer.get_image_stats(original_image)
-                enhanced_stats = st.session_state.enhancer.get_image_stats(enhanced_image)
+                original_stats = st.session_state.original_stats
+                enhanced_stats = _image_stats_cached(image_key, image_bytes, settings_key)
                 
                 # Display metrics
                 stat_col1, stat_col2, stat_col3 = st.columns(3)
@@ -400,13 +753,84 @@ def main():
             st.info("💡 Try adjusting the settings or uploading a different image")
             st.write("Debug info:", str(e))
 
+def main():
+    # Header
+    st.markdown("""
+    <div class="main-header">
+        <h1>🎨 Image Quality Enhancer</h1>
+        <p style="text-align: center; color: white; margin: 0;">
+            Minimal Dependencies Version - Works on All Platforms!
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Success message
+    st.success("✅ **Minimal Version Loaded Successfully!** - Requires only PIL + NumPy; OpenCV and Numba speed it up when installed")
+    
+    # File upload
+    st.subheader("📁 Upload Your Image")
+    uploaded_file = st.file_uploader(
+        "Choose an image file",
+        type=['png', 'jpg', 'jpeg', 'tiff', 'tif'],
+        help="Upload JPEG, PNG, or TIFF images"
+    )
+    
+    if uploaded_file is None:
+        st.info("👆 Please upload an image file to get started!")
+        st.markdown("""
+        ### 📋 Features (Minimal Version):
+        - **Real-time preview**: See changes instantly
+        - **Image upscaling**: 1x to 4x resolution increase
+        - **Basic enhancements**: Brightness, contrast, saturation, sharpness
+        - **Noise reduction**: Gaussian blur and smoothing filters
+        - **Download results**: Save your enhanced images
+        - **Zero dependency issues**: Uses only PIL and NumPy
+        """)
+        return
+    
+    # Validate file
+    is_valid, message = _get_enhancer().validate_image(uploaded_file)
+    if not is_valid:
+        st.error(f"❌ {message}")
+        return
+    
+    # Load image: the full size comes from the header, pixels are decoded at preview scale
+    try:
+        st.session_state.image_bytes = uploaded_file.getvalue()
+        st.session_state.image_key = uploaded_file.file_id
+        original_width, original_height = Image.open(io.BytesIO(st.session_state.image_bytes)).size
+        original_image = _load_preview_cached(st.session_state.image_key, st.session_state.image_bytes)
+        
+        st.session_state.original_image = original_image
+        
+        # The original's statistics never change, so compute them once per upload
+        if st.session_state.get('original_stats_key') != st.session_state.image_key:
+            st.session_state.original_stats = _image_stats_cached(
+                st.session_state.image_key, st.session_state.image_bytes
+            )
+            st.session_state.original_stats_key = st.session_state.image_key
+        st.success(f"✅ Image loaded: {original_width}×{original_height} pixels")
+    except Exception as e:
+        st.error(f"❌ Error loading image: {str(e)}")
+        return
+    
+    # Real-time enhancement indicator
+    st.markdown("""
+    <div class="real-time-indicator">
+        🔄 <strong>Real-time Enhancement Active</strong> - Adjust sliders to see instant changes!
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Controls and preview rerun on their own when a slider moves
+    render_editor(original_image, (original_width, original_height), uploaded_file.name)
+    
     # Info section
     with st.expander("ℹ️ About This Minimal Version"):
         st.markdown("""
         ### 🔧 Technical Details:
-        - **Dependencies**: Only PIL (Pillow) and NumPy
-        - **Upscaling**: PIL's built-in interpolation algorithms
-        - **Enhancements**: PIL's ImageEnhance module
+        - **Dependencies**: PIL (Pillow) and NumPy; OpenCV and Numba are optional accelerators
+        - **Upscaling**: OpenCV's resize when installed, otherwise PIL's built-in interpolation algorithms
+        - **Enhancements**: Brightness, contrast and saturation fused into one NumPy/OpenCV colour map
         - **Noise Reduction**: Gaussian blur and smoothing filters
         - **Compatibility**: Works on all Streamlit Cloud deployments
         